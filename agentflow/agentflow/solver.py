@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import time
 import json
 from typing import Optional
@@ -195,6 +196,16 @@ class Solver:
 
         return json_data
 
+    async def asolve(self, question: str, image_path: Optional[str] = None):
+        """
+        Solve a single problem from async code.
+
+        The planner/verifier/executor engines are synchronous, so this runs
+        solve() in a worker thread to keep the event loop free; it becomes
+        the natural override point once the engines grow native async APIs.
+        """
+        return await asyncio.to_thread(self.solve, question, image_path)
+
 def construct_solver(llm_engine_name : str = "gpt-4o",
                      enabled_tools : list[str] = ["all"],
                      tool_engine: list[str] = ["Default"],
@@ -1,5 +1,7 @@
 # agentflow/tools/base.py
 
+import asyncio
+
 from agentflow.engine.openai import ChatOpenAI
 
 class BaseTool:
@@ -100,4 +102,14 @@ class BaseTool:
         Raises:
             NotImplementedError: If the subclass does not implement this method.
         """
-        raise NotImplementedError("Subclasses must implement the execute method.")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement the execute method.")
+
+    async def aexecute(self, *args, **kwargs):
+        """
+        Execute the tool's main functionality from async code.
+
+        By default this runs the synchronous execute() in a worker thread so it
+        does not block the event loop. Tools with a native async implementation
+        should override this method.
+        """
+        return await asyncio.to_thread(self.execute, *args, **kwargs)
\ No newline at end of file
@@ -0,0 +1,795 @@
+import os
+import json
+import time
+import shlex
+import socket
+import random
+import atexit
+import asyncio
+import hashlib
+import logging
+import functools
+import threading
+import importlib.util
+import concurrent.futures
+from dotenv import load_dotenv
+load_dotenv()
+
+import httpx
+
+# JSON fast path for the small JSON-RPC payloads on the hot path: orjson
+# (C + SIMD) when available, stdlib otherwise. _json_dumps returns bytes in
+# both cases so callers can post the encoded body directly.
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json as _stdlib_json
+
+    def _json_dumps(obj):
+        return _stdlib_json.dumps(obj).encode("utf-8")
+
+    def _json_loads(data):
+        return _stdlib_json.loads(data)
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from agentflow.tools.base import BaseTool
+
+# Tool name mapping - this defines the external name for this tool
+TOOL_NAME = "MCP_Bridge_Tool"
+
+# Lazy logging instead of print(): stdout writes are a syscall per line and
+# dominate tight reconnect loops; debug strings are never built unless the
+# level is enabled.
+logger = logging.getLogger("agentflow.mcp_bridge")
+
+LIMITATIONS = """
+1. This tool requires a running MCP server (stdio subprocess or HTTP endpoint) configured via environment variables.
+2. The available tools depend entirely on what the configured MCP server exposes.
+3. Tool arguments must match the input schema declared by the MCP server, otherwise the server will reject the call.
+"""
+
+BEST_PRACTICES = """
+1. Use get_available_tools() first to inspect which tools the MCP server exposes and their input schemas.
+2. Pass arguments as a dict that matches the tool's declared input schema.
+3. Set MCP_SERVER_TYPE to "stdio" for a local subprocess server or "http" for a remote endpoint.
+4. Keep one MCP_Bridge_Tool instance alive and reuse it; the connection persists across calls.
+"""
+
+
+class _AsyncLoopThread:
+    """
+    Runs a private asyncio event loop on a daemon thread.
+
+    The MCP session and HTTP client live on this loop, so they stay alive
+    across synchronous execute() calls instead of being rebuilt per call.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="mcp-bridge-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def is_alive(self):
+        return self._thread.is_alive() and not self._loop.is_closed()
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+# A single shared loop thread for all MCP_Bridge_Tool instances. Cached
+# sessions are bound to the loop they were created on, so sharing them
+# across instances requires sharing the loop as well.
+_LOOP_THREAD = None
+_LOOP_THREAD_LOCK = threading.Lock()
+
+# Module-level connection and tools caches keyed by
+# (server_type, server_command, tuple(server_args), server_url). Multiple
+# tool instances pointing at the same server config reuse one stdio
+# subprocess and one tools list instead of reconnecting per instance.
+_SESSION_CACHE = {}
+_TOOLS_CACHE = {}
+_CACHE_LOCK = asyncio.Lock()
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+# Result memoization is opt-in and only for tools declared side-effect free
+# via MCP_CACHEABLE_TOOLS (e.g. "echo,text_transform,get_system_info").
+_RESULT_CACHE_MAXSIZE = 1024
+_RESULT_CACHE_TTL = float(os.getenv("MCP_CACHE_TTL", "60"))
+
+# Pool of pre-warmed stdio server connections (already past initialize and
+# tools/list), so reconnecting after a crash skips the subprocess cold start.
+# MCP_SERVER_POOL_SIZE=1 (the default) keeps no spares, preserving the old
+# one-process behavior.
+_STDIO_POOL = {}
+_STDIO_POOL_SPARES = max(0, int(os.getenv("MCP_SERVER_POOL_SIZE", "1")) - 1)
+
+# On-disk tools-list cache: warm starts skip the tools/list round trip and
+# validate in the background instead.
+_TOOLS_DISK_CACHE_DIR = os.path.expanduser("~/.cache/agentflow/mcp")
+
+# One shared httpx.AsyncClient per server URL: N agents hitting the same MCP
+# server share one connection pool instead of opening N pools of sockets.
+_HTTP_CLIENTS = {}
+_HTTP_CLIENTS_LOCK = asyncio.Lock()
+
+
+def _close_all_http_clients():
+    """Process-exit hook: close every shared HTTP client on the running loop."""
+    with _LOOP_THREAD_LOCK:
+        loop_thread = _LOOP_THREAD
+    if loop_thread is None or not loop_thread.is_alive():
+        return
+    for client in list(_HTTP_CLIENTS.values()):
+        try:
+            loop_thread.submit(client.aclose()).result(timeout=5)
+        except Exception:
+            pass
+    _HTTP_CLIENTS.clear()
+
+
+def _shutdown_loop_thread():
+    global _LOOP_THREAD
+    with _LOOP_THREAD_LOCK:
+        if _LOOP_THREAD is not None and _LOOP_THREAD.is_alive():
+            _LOOP_THREAD.stop()
+
+
+# atexit runs LIFO: clients are closed first, then the loop thread stops.
+atexit.register(_shutdown_loop_thread)
+atexit.register(_close_all_http_clients)
+
+
+def _generic_decode(result_data):
+    """Defensive extraction for responses of unknown shape."""
+    content = result_data.get("content")
+    if not content:
+        return {}
+    return content[0].get("text", {})
+
+
+def _fast_decode(result_data):
+    """Specialized extraction for the stable {"content": [{"text": ...}]} shape.
+
+    Direct indexing skips the .get chain; any shape mismatch falls back to
+    the generic path.
+    """
+    try:
+        return result_data["content"][0]["text"]
+    except (KeyError, IndexError, TypeError):
+        return _generic_decode(result_data)
+
+
+@functools.lru_cache(maxsize=1)
+def _parsed_server_args():
+    # shlex handles quoted paths with spaces, which str.split() mangled;
+    # memoized so multi-agent setups don't re-parse the env per instance.
+    return tuple(shlex.split(os.getenv("MCP_SERVER_ARGS", "")))
+
+
+def _get_loop_thread():
+    global _LOOP_THREAD
+    with _LOOP_THREAD_LOCK:
+        if _LOOP_THREAD is None or not _LOOP_THREAD.is_alive():
+            _LOOP_THREAD = _AsyncLoopThread()
+        return _LOOP_THREAD
+
+
+class MCP_Bridge_Tool(BaseTool):
+    def __init__(self, model_string=None, validate_tool_exists=False):
+        super().__init__(
+            tool_name=TOOL_NAME,
+            tool_description="A bridge tool that exposes the tools of an MCP (Model Context Protocol) server. It connects once to a stdio or HTTP MCP server and forwards tool calls over the persistent session.",
+            tool_version="1.0.0",
+            input_types={
+                "tool_name": "str - The name of the MCP server tool to call.",
+                "arguments": "dict - The arguments to pass to the MCP tool, matching its input schema (default: {}).",
+                "timeout": "int - Maximum time in seconds to wait for the call to complete (default: 60).",
+            },
+            output_type="dict - A dict with 'success' and either 'result' (on success) or 'error' (on failure).",
+            demo_commands=[
+                {
+                    "command": 'execution = tool.execute(tool_name="echo", arguments={"text": "hello"})',
+                    "description": "Call the MCP server's echo tool with a text argument."
+                },
+                {
+                    "command": 'execution = tool.execute(tool_name="get_system_info", arguments={"field": "platform"}, timeout=30)',
+                    "description": "Call an MCP tool with a custom timeout."
+                },
+            ],
+            user_metadata={
+                "limitations": LIMITATIONS,
+                "best_practices": BEST_PRACTICES,
+            }
+        )
+        self.server_type = os.getenv("MCP_SERVER_TYPE", "stdio").lower()
+        self.server_command = os.getenv("MCP_SERVER_COMMAND", "python")
+        self.server_args = list(_parsed_server_args())
+        self.server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8000")
+
+        self._session = None
+        self._http_client = None
+        self._available_tools = {}
+        self._stdio_ctx = None
+        self._session_ctx = None
+        self._stdio_lock = None
+
+        self._cache_key = (self.server_type, self.server_command, tuple(self.server_args), self.server_url)
+
+        # TTL cache of results for pure tools: (tool_name, canonical args) -> (expiry, envelope)
+        self._pure_tools = set(filter(None, os.getenv("MCP_CACHEABLE_TOOLS", "").split(",")))
+        self._result_cache = {}
+
+        # Optional client-side gate on tool names. Off by default: the
+        # tools/list snapshot can be stale (servers may hot-load tools
+        # mid-session), so unknown names are left for the server to reject.
+        self.validate_tool_exists = validate_tool_exists
+        # Cached user-facing tool list; rebuilt lazily, dropped on reconnect.
+        self._available_tools_list = None
+        # Pre-encoded JSON-RPC body prefixes and response decoders per tool
+        # (HTTP transport only); regenerated on reconnect.
+        self._rpc_templates = {}
+        self._decoders = {}
+
+        # All connecting and calling happens on the shared loop thread, so the
+        # stdio subprocess / HTTP connection pool survives across execute()
+        # calls and can be reused by other instances with the same config.
+        self._loop_thread = _get_loop_thread()
+
+    def _tools_disk_cache_path(self):
+        key = hashlib.sha256(repr(self._cache_key).encode()).hexdigest()[:16]
+        return os.path.join(_TOOLS_DISK_CACHE_DIR, key + ".json")
+
+    def _load_tools_from_disk(self):
+        """Return the persisted tools list for this server config, or None."""
+        try:
+            with open(self._tools_disk_cache_path(), "rb") as f:
+                data = _json_loads(f.read())
+            return {name: (entry[0], entry[1]) for name, entry in data["tools"].items()}
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    def _save_tools_to_disk(self):
+        """Atomically persist the current tools list for warm starts."""
+        try:
+            os.makedirs(_TOOLS_DISK_CACHE_DIR, exist_ok=True)
+            path = self._tools_disk_cache_path()
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_json_dumps({"tools": {name: list(entry) for name, entry in self._available_tools.items()}}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Could not persist MCP tools cache: %s", e)
+
+    def _schedule_tools_refresh(self):
+        """Revalidate a disk-cached tools list against the live server in the background."""
+        async def _refresh():
+            try:
+                if self.server_type == "stdio":
+                    # Same invariant as _execute_stdio: every await on the
+                    # single stdio pipe must hold the per-session lock, or
+                    # this refresh could interleave with an in-flight call.
+                    async with self._stdio_lock:
+                        tools_response = await self._session.list_tools()
+                    tools = {tool.name: (tool.description, tool.inputSchema) for tool in tools_response.tools}
+                else:
+                    response = await self._http_client.get("/tools/list")
+                    response.raise_for_status()
+                    tools_data = _json_loads(response.content)
+                    tools = {
+                        tool["name"]: (tool.get("description", ""), tool.get("inputSchema", {}))
+                        for tool in tools_data.get("tools", [])
+                    }
+                if tools != self._available_tools:
+                    self._available_tools = tools
+                    self._available_tools_list = None
+                    if self.server_type == "http":
+                        self._build_rpc_templates()
+                    _TOOLS_CACHE[self._cache_key] = tools
+                self._save_tools_to_disk()
+            except Exception as e:
+                logger.debug("Background tools/list refresh failed: %s", e)
+
+        asyncio.ensure_future(_refresh())
+
+    async def _spawn_stdio(self, fetch_tools=True):
+        """Spawn one stdio server subprocess and run it through initialize (+ tools/list)."""
+        server_params = StdioServerParameters(command=self.server_command, args=self.server_args)
+        stdio_ctx = stdio_client(server_params)
+        read_stream, write_stream = await stdio_ctx.__aenter__()
+        session_ctx = ClientSession(read_stream, write_stream)
+        session = await session_ctx.__aenter__()
+        await session.initialize()
+
+        tools = None
+        if fetch_tools:
+            tools_response = await session.list_tools()
+            # Store (description, input_schema) tuples rather than per-tool dicts;
+            # user-facing dicts are built lazily in get_available_tools().
+            tools = {
+                tool.name: (tool.description, tool.inputSchema)
+                for tool in tools_response.tools
+            }
+        # stdio is a single full-duplex pipe: concurrent call_tool awaits
+        # (batch fan-out, shared cached sessions) must serialize on this lock.
+        return {
+            "session": session,
+            "session_ctx": session_ctx,
+            "stdio_ctx": stdio_ctx,
+            "tools": tools,
+            "lock": asyncio.Lock(),
+        }
+
+    def _refill_stdio_pool(self):
+        """Top up the pre-warmed spare connections for this server config in the background."""
+        if _STDIO_POOL_SPARES <= 0:
+            return
+        pool = _STDIO_POOL.setdefault(self._cache_key, [])
+
+        async def _refill():
+            try:
+                while len(pool) < _STDIO_POOL_SPARES:
+                    pool.append(await self._spawn_stdio())
+            except Exception as e:
+                logger.warning("Could not pre-warm stdio MCP server: %s", e)
+
+        asyncio.ensure_future(_refill())
+
+    async def _connect_stdio(self):
+        """Adopt a pre-warmed stdio connection if one is pooled, else spawn and initialize one."""
+        refresh_from_disk = False
+        pool = _STDIO_POOL.get(self._cache_key)
+        if pool:
+            conn = pool.pop()
+        else:
+            cached_tools = self._load_tools_from_disk()
+            conn = await self._spawn_stdio(fetch_tools=cached_tools is None)
+            if conn["tools"] is None:
+                conn["tools"] = cached_tools
+                refresh_from_disk = True
+        self._stdio_ctx = conn["stdio_ctx"]
+        self._session_ctx = conn["session_ctx"]
+        self._session = conn["session"]
+        self._stdio_lock = conn["lock"]
+        self._available_tools = conn["tools"]
+        logger.debug("Connected to stdio MCP server (%s) with %d tools", self.server_command, len(self._available_tools))
+        if refresh_from_disk:
+            # Adopted a persisted tools list without the round trip; validate
+            # it against the live server off the critical path.
+            self._schedule_tools_refresh()
+        else:
+            self._save_tools_to_disk()
+        self._refill_stdio_pool()
+
+    async def _connect_http(self):
+        """Open a persistent HTTP client to the MCP server and fetch its tool list."""
+        async with _HTTP_CLIENTS_LOCK:
+            client = _HTTP_CLIENTS.get(self.server_url)
+            if client is None:
+                # MCP JSON-RPC messages are small and request/response shaped,
+                # the exact pattern where Nagle's algorithm delays the tail of
+                # each request; disable it on the underlying sockets. HTTP/2
+                # multiplexing is enabled when the optional h2 package is
+                # installed.
+                transport = httpx.AsyncHTTPTransport(
+                    socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+                    http2=importlib.util.find_spec("h2") is not None,
+                )
+                client = httpx.AsyncClient(
+                    base_url=self.server_url,
+                    timeout=30.0,
+                    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                    transport=transport,
+                )
+                _HTTP_CLIENTS[self.server_url] = client
+        self._http_client = client
+        if self._cache_key in _TOOLS_CACHE:
+            self._available_tools = _TOOLS_CACHE[self._cache_key]
+            self._build_rpc_templates()
+            return
+        cached_tools = self._load_tools_from_disk()
+        if cached_tools is not None:
+            self._available_tools = cached_tools
+            self._build_rpc_templates()
+            self._schedule_tools_refresh()
+            return
+        response = await self._http_client.get("/tools/list")
+        response.raise_for_status()
+        # Single decode pass: go straight from the parsed response to compact
+        # (description, input_schema) tuples without intermediate wrapper dicts.
+        tools_data = _json_loads(response.content)
+        available = {}
+        for tool in tools_data.get("tools", []):
+            available[tool["name"]] = (tool.get("description", ""), tool.get("inputSchema", {}))
+        self._available_tools = available
+        self._build_rpc_templates()
+        self._save_tools_to_disk()
+        logger.debug("Connected to HTTP MCP server (%s) with %d tools", self.server_url, len(self._available_tools))
+
+    def _build_rpc_templates(self):
+        """Pre-encode the fixed prefix of each tool's tools/call body.
+
+        At call time only the arguments are serialized and appended, saving a
+        dict allocation and the key scan in the encoder per request.
+        """
+        self._rpc_templates = {
+            name: b'{"name":' + _json_dumps(name) + b',"arguments":'
+            for name in self._available_tools
+        }
+        # Tools known at connect time get the specialized response decoder;
+        # dynamic tool names stay on the generic path.
+        self._decoders = {name: _fast_decode for name in self._available_tools}
+
+    async def _ensure_connection(self):
+        """Connect to the MCP server if not already connected, with retries.
+
+        Connections are shared: a cached session for the same server config is
+        adopted instead of spawning a second subprocess.
+        """
+        if self.server_type == "stdio" and self._session is not None:
+            return
+        if self.server_type == "http" and self._http_client is not None:
+            return
+
+        async with _CACHE_LOCK:
+            if self.server_type == "stdio" and self._cache_key in _SESSION_CACHE:
+                cached = _SESSION_CACHE[self._cache_key]
+                self._session = cached["session"]
+                self._session_ctx = cached["session_ctx"]
+                self._stdio_ctx = cached["stdio_ctx"]
+                self._stdio_lock = cached["lock"]
+                self._available_tools = _TOOLS_CACHE[self._cache_key]
+                _CACHE_STATS["hits"] += 1
+                return
+
+            last_error = None
+            for attempt in range(3):
+                try:
+                    if self.server_type == "stdio":
+                        await self._connect_stdio()
+                        _SESSION_CACHE[self._cache_key] = {
+                            "session": self._session,
+                            "session_ctx": self._session_ctx,
+                            "stdio_ctx": self._stdio_ctx,
+                            "lock": self._stdio_lock,
+                        }
+                    else:
+                        await self._connect_http()
+                    _TOOLS_CACHE[self._cache_key] = self._available_tools
+                    _CACHE_STATS["misses"] += 1
+                    return
+                except Exception as e:
+                    last_error = e
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("MCP connection attempt %d failed: %s. Retrying...", attempt + 1, e)
+                    await self._cleanup()
+                    # Exponential backoff with jitter: transient failures
+                    # retry within ~100ms instead of a flat 1s, and the jitter
+                    # de-correlates reconnect storms across agents. No sleep
+                    # after the final attempt.
+                    if attempt < 2:
+                        await asyncio.sleep(min(0.1 * (2 ** attempt), 5.0) + random.random() * 0.25)
+
+        logger.error("Could not connect to MCP server after 3 attempts. Last error: %s", last_error)
+        raise ConnectionError(f"Could not connect to MCP server after 3 attempts. Last error: {str(last_error)}")
+
+    async def _cleanup(self):
+        """Tear down the session/transport after a failure or on close."""
+        if self._session_ctx is not None:
+            try:
+                await self._session_ctx.__aexit__(None, None, None)
+            except Exception:
+                pass
+            self._session_ctx = None
+            self._session = None
+        if self._stdio_ctx is not None:
+            try:
+                await self._stdio_ctx.__aexit__(None, None, None)
+            except Exception:
+                pass
+            self._stdio_ctx = None
+        self._stdio_lock = None
+        # The HTTP client is shared per URL; detach without closing it.
+        self._http_client = None
+        self._available_tools = {}
+        self._available_tools_list = None
+        self._rpc_templates = {}
+        self._decoders = {}
+        # Memoized results may be stale after a reconnect
+        self._result_cache.clear()
+
+    async def _execute_stdio(self, tool_name, arguments):
+        async with self._stdio_lock:
+            result = await self._session.call_tool(tool_name, arguments=arguments)
+        # Explicit branch instead of "[0].text if ... else {}": avoids building
+        # fallback literals on every successful call.
+        if not result.content:
+            return {}
+        return result.content[0].text
+
+    async def _execute_http(self, tool_name, arguments):
+        template = self._rpc_templates.get(tool_name)
+        if template is not None:
+            body = template + _json_dumps(arguments) + b"}"
+        else:
+            body = _json_dumps({"name": tool_name, "arguments": arguments})
+        response = await self._http_client.post(
+            "/tools/call",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        result_data = _json_loads(response.content)
+        return self._decoders.get(tool_name, _generic_decode)(result_data)
+
+    async def _execute_async(self, tool_name, arguments):
+        await self._ensure_connection()
+
+        if self.validate_tool_exists and tool_name not in self._available_tools:
+            return {"success": False, "error": f"Tool '{tool_name}' is not available on the MCP server. Available tools: {list(self._available_tools.keys())}"}
+
+        try:
+            if self.server_type == "stdio":
+                result = await self._execute_stdio(tool_name, arguments)
+            else:
+                result = await self._execute_http(tool_name, arguments)
+            return {"success": True, "result": result}
+        except Exception as e:
+            return {"success": False, "error": f"Error calling MCP tool '{tool_name}': {str(e)}"}
+
+    def _cache_lookup(self, tool_name, arguments):
+        """Return (cache_key, cached_envelope). cache_key is None for uncacheable tools."""
+        if tool_name not in self._pure_tools:
+            return None, None
+        cache_key = (tool_name, json.dumps(arguments, sort_keys=True))
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            expiry, envelope = cached
+            if time.monotonic() < expiry:
+                envelope = dict(envelope)
+                envelope["cached"] = True
+                return cache_key, envelope
+            del self._result_cache[cache_key]
+        return cache_key, None
+
+    def _cache_store(self, cache_key, result):
+        if cache_key is None or not result.get("success"):
+            return
+        if len(self._result_cache) >= _RESULT_CACHE_MAXSIZE:
+            self._result_cache.pop(next(iter(self._result_cache)))
+        self._result_cache[cache_key] = (time.monotonic() + _RESULT_CACHE_TTL, result)
+
+    def execute(self, tool_name, arguments=None, timeout=60):
+        """
+        Call a tool on the configured MCP server (synchronous entry point).
+
+        Must not be called from async code — await aexecute() there instead.
+
+        Parameters:
+            tool_name (str): The name of the MCP server tool to call.
+            arguments (dict): The arguments to pass to the MCP tool. Default is {}.
+            timeout (int): Maximum time in seconds to wait for the call. Default is 60.
+
+        Returns:
+            dict: {"success": True, "result": ...} on success, or {"success": False, "error": ...} on failure.
+            Memoized responses for tools listed in MCP_CACHEABLE_TOOLS additionally carry "cached": True.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError("MCP_Bridge_Tool.execute() cannot be called from async code; await aexecute() instead.")
+
+        arguments = arguments or {}
+        cache_key, cached = self._cache_lookup(tool_name, arguments)
+        if cached is not None:
+            return cached
+
+        try:
+            # Reuse the long-lived loop; if it was stopped (e.g. during
+            # interpreter teardown of a previous run) pick up a fresh one
+            # rather than building a throwaway loop per call.
+            if not self._loop_thread.is_alive():
+                self._loop_thread = _get_loop_thread()
+            result = self._loop_thread.submit(self._execute_async(tool_name, arguments)).result(timeout=timeout)
+            self._cache_store(cache_key, result)
+            return result
+        except concurrent.futures.TimeoutError:
+            # Aliases builtin TimeoutError on 3.11+, but is a distinct class
+            # on 3.10, where a bare TimeoutError would never match.
+            return {"success": False, "error": f"MCP tool '{tool_name}' timed out after {timeout}s"}
+        except Exception as e:
+            return {"success": False, "error": f"Error executing MCP tool '{tool_name}': {str(e)}"}
+
+    async def aexecute(self, tool_name, arguments=None, timeout=60):
+        """
+        Call a tool on the configured MCP server from async code.
+
+        The call still runs on the shared loop thread (the sessions and HTTP
+        clients are bound to it), but awaiting the wrapped future keeps the
+        caller's event loop free, so asyncio.gather over several MCP tools
+        actually fans out.
+
+        Parameters and return value are the same as execute().
+        """
+        arguments = arguments or {}
+        cache_key, cached = self._cache_lookup(tool_name, arguments)
+        if cached is not None:
+            return cached
+
+        if not self._loop_thread.is_alive():
+            self._loop_thread = _get_loop_thread()
+        future = asyncio.wrap_future(self._loop_thread.submit(self._execute_async(tool_name, arguments)))
+        try:
+            result = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return {"success": False, "error": f"MCP tool '{tool_name}' timed out after {timeout}s"}
+        except Exception as e:
+            return {"success": False, "error": f"Error executing MCP tool '{tool_name}': {str(e)}"}
+        self._cache_store(cache_key, result)
+        return result
+
+    async def _execute_batch_async(self, calls):
+        return await asyncio.gather(
+            *[self._execute_async(call["tool_name"], call.get("arguments") or {}) for call in calls],
+            return_exceptions=True,
+        )
+
+    def execute_batch(self, calls, timeout=60):
+        """
+        Call several MCP tools concurrently and wait for all of them.
+
+        On the HTTP transport the calls fan out over the connection pool, so
+        the batch finishes in roughly the latency of the slowest call. On
+        stdio the calls still share one pipe and serialize at the transport,
+        but the Python-side orchestration is overlapped.
+
+        Parameters:
+            calls (list): A list of dicts, each with 'tool_name' and optional 'arguments'.
+            timeout (int): Maximum time in seconds to wait for the whole batch. Default is 60.
+
+        Returns:
+            list: One result envelope per call, in the same order as the input.
+        """
+        try:
+            if not self._loop_thread.is_alive():
+                self._loop_thread = _get_loop_thread()
+            results = self._loop_thread.submit(self._execute_batch_async(calls)).result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            return [{"success": False, "error": f"MCP batch timed out after {timeout}s"} for _ in calls]
+        except Exception as e:
+            return [{"success": False, "error": f"Error executing MCP batch: {str(e)}"} for _ in calls]
+        return [
+            result if not isinstance(result, BaseException) else {"success": False, "error": str(result)}
+            for result in results
+        ]
+
+    def get_available_tools(self):
+        """
+        Returns the list of tools exposed by the MCP server.
+
+        Returns:
+            list: A list of dicts with 'name', 'description' and 'input_schema' for each tool.
+        """
+        if not self._available_tools:
+            self._loop_thread.submit(self._ensure_connection()).result(timeout=60)
+        if self._available_tools_list is None:
+            self._available_tools_list = [
+                {"name": name, "description": description, "input_schema": input_schema}
+                for name, (description, input_schema) in self._available_tools.items()
+            ]
+        return self._available_tools_list
+
+    def get_cache_stats(self):
+        """
+        Returns statistics for the shared connection/tools caches.
+
+        Returns:
+            dict: Hit/miss counters and current cache sizes.
+        """
+        return {
+            "hits": _CACHE_STATS["hits"],
+            "misses": _CACHE_STATS["misses"],
+            "cached_sessions": len(_SESSION_CACHE),
+            "cached_tool_lists": len(_TOOLS_CACHE),
+        }
+
+    def close(self, evict=False):
+        """
+        Release this instance's handle on the MCP server.
+
+        By default the shared cached session stays alive for other instances
+        with the same config; pass evict=True to tear it down and drop it from
+        the module caches.
+        """
+        self._http_client = None
+        if evict:
+            _SESSION_CACHE.pop(self._cache_key, None)
+            _TOOLS_CACHE.pop(self._cache_key, None)
+            client = _HTTP_CLIENTS.pop(self.server_url, None)
+            if client is not None:
+                try:
+                    self._loop_thread.submit(client.aclose()).result(timeout=10)
+                except Exception:
+                    pass
+            if self._session is not None or self._stdio_ctx is not None:
+                try:
+                    self._loop_thread.submit(self._cleanup()).result(timeout=10)
+                except Exception:
+                    pass
+        else:
+            self._session = None
+            self._session_ctx = None
+            self._stdio_ctx = None
+            self._stdio_lock = None
+            self._available_tools = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_metadata(self):
+        """
+        Returns the metadata for the MCP_Bridge tool.
+
+        Returns:
+            dict: A dictionary containing the tool's metadata.
+        """
+        metadata = super().get_metadata()
+        return metadata
+
+
+if __name__ == "__main__":
+    """
+    Test:
+    cd agentflow/tools/mcp_bridge
+    MCP_SERVER_TYPE=stdio MCP_SERVER_COMMAND=python MCP_SERVER_ARGS="example_server.py" python tool.py
+    """
+    import json
+
+    tool = MCP_Bridge_Tool()
+
+    # Get tool metadata
+    metadata = tool.get_metadata()
+    print("Tool Metadata:")
+    print(json.dumps(metadata, indent=4))
+
+    try:
+        available = tool.get_available_tools()
+        print(f"\nAvailable MCP tools: {[t['name'] for t in available]}")
+
+        examples = [
+            {"tool_name": "echo", "arguments": {"text": "hello"}},
+            {"tool_name": "get_system_info", "arguments": {"field": "platform"}},
+        ]
+        for example in examples:
+            print(f"\nExecuting MCP tool: {example['tool_name']}")
+            result = tool.execute(**example)
+            print("Result:")
+            print(json.dumps(result, indent=4))
+            print("-" * 50)
+    except Exception as e:
+        print(f"Error: {str(e)}")
+    finally:
+        tool.close()
+
+    print("Done!")
@@ -0,0 +1,794 @@
+"""
+Research report workflow built on top of the AgentFlow solver.
+
+Runs a multi-stage pipeline of specialized agents to turn a topic into a
+short research report:
+
+    Stage 1  planner      - propose web search queries for the topic
+    Stage 2  researcher   - run the searches
+    Stage 3  cleaner      - deduplicate / clean the raw search results
+    Stage 4  extractor    - extract key facts        (runs concurrently)
+             identifier   - identify bias            (runs concurrently)
+             analyzer     - analyze sentiment        (runs concurrently)
+    Stage 5  checker      - fact-check the extracted facts
+    Stage 6  generator    - merge the analyses into report notes
+    Stage 7  writer       - write the report
+    Stage 8  proofreader  - final proofreading pass
+
+Usage:
+    python scripts/research_report_workflow.py --topic "The impact of open-source LLMs"
+    python scripts/research_report_workflow.py --test
+"""
+
+import os
+import re
+import json
+import time
+import pickle
+import random
+import asyncio
+import hashlib
+import argparse
+import functools
+from array import array
+from types import SimpleNamespace
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from agentflow.agentflow.solver import Solver, construct_solver
+
+# Semantic caching is optional: it needs sentence-transformers and faiss,
+# which are not part of the core install. Without them the workflow simply
+# calls the agents every time.
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# orjson parses Stage 1/4 JSON responses 2-5x faster than stdlib json;
+# fall back silently when it is not installed.
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _json_loads(data):
+        return json.loads(data)
+
+CACHE_DIR = os.path.expanduser("~/.cache/agentflow/research_workflow")
+
+# One node of the workflow DAG: fn is an async callable(topic, results) whose
+# return value is stored in results[name] once the task completes.
+Task = namedtuple("Task", "name deps fn")
+
+# Fallback extractor for planner responses without parseable JSON: strips
+# list markers / quoting and keeps any line with enough substance.
+_QUERY_LINE_RE = re.compile(r'^[\s"0-9.\-*)]*(.{10,})$')
+
+
+# Per-agent timeout budgets (seconds). Cheap agents fail fast instead of
+# sitting on a hung connection for the worst-case budget; expensive agents
+# (writer, fused analysis) get the headroom they actually need.
+TIMEOUTS = {
+    "planner": 20,
+    "researcher": 45,
+    "cleaner": 30,
+    "extractor": 25,
+    "identifier": 25,
+    "analyzer": 20,
+    "analysis": 45,
+    "checker": 25,
+    "generator": 30,
+    "writer": 60,
+    "proofreader": 45,
+}
+DEFAULT_TIMEOUT = 90
+
+
+def _timeout_for(agent_name):
+    """Look up an agent's timeout budget; 'researcher_3' matches 'researcher'."""
+    if agent_name in TIMEOUTS:
+        return TIMEOUTS[agent_name]
+    return TIMEOUTS.get(agent_name.rsplit("_", 1)[0], DEFAULT_TIMEOUT)
+
+
+def _find_json_object(response, token):
+    """
+    Locate and parse the JSON object containing `token` in an LLM response.
+
+    Finds the token, backs up to its enclosing '{' and walks forward with a
+    brace counter -- O(n), no regex backtracking. Returns the parsed dict,
+    or None when no well-formed object is found.
+    """
+    token_idx = response.find(token)
+    if token_idx == -1:
+        return None
+    start = response.rfind("{", 0, token_idx)
+    if start == -1:
+        return None
+    depth = 0
+    for end in range(start, len(response)):
+        char = response[end]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                try:
+                    return _json_loads(response[start:end + 1])
+                except ValueError:
+                    return None
+    return None
+
+
+class SemanticCache:
+    """
+    Cache agent responses keyed by prompt embedding.
+
+    Near-identical prompts (cosine similarity >= threshold) reuse the stored
+    response instead of paying a full solve() round trip. One FAISS index is
+    kept per agent name and persisted to disk so reruns benefit too.
+    """
+
+    EMBEDDING_DIM = 384  # all-MiniLM-L6-v2
+
+    def __init__(self, threshold=0.92):
+        self.threshold = threshold
+        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.indexes = {}   # agent_name -> faiss.IndexFlatIP
+        self.outputs = {}   # agent_name -> list of stored responses
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+    def _index_for(self, agent_name):
+        if agent_name not in self.indexes:
+            index_path = os.path.join(CACHE_DIR, f"{agent_name}.faiss")
+            outputs_path = os.path.join(CACHE_DIR, f"{agent_name}.pkl")
+            if os.path.exists(index_path) and os.path.exists(outputs_path):
+                self.indexes[agent_name] = faiss.read_index(index_path)
+                with open(outputs_path, "rb") as f:
+                    self.outputs[agent_name] = pickle.load(f)
+            else:
+                self.indexes[agent_name] = faiss.IndexFlatIP(self.EMBEDDING_DIM)
+                self.outputs[agent_name] = []
+        return self.indexes[agent_name]
+
+    def lookup(self, agent_name, query):
+        index = self._index_for(agent_name)
+        if index.ntotal == 0:
+            return None
+        embedding = self.model.encode(query, normalize_embeddings=True)
+        scores, ids = index.search(embedding[None], 1)
+        if scores[0, 0] >= self.threshold:
+            return self.outputs[agent_name][ids[0, 0]]
+        return None
+
+    def store(self, agent_name, query, output):
+        index = self._index_for(agent_name)
+        embedding = self.model.encode(query, normalize_embeddings=True)
+        index.add(embedding[None])
+        self.outputs[agent_name].append(output)
+        faiss.write_index(index, os.path.join(CACHE_DIR, f"{agent_name}.faiss"))
+        with open(os.path.join(CACHE_DIR, f"{agent_name}.pkl"), "wb") as f:
+            pickle.dump(self.outputs[agent_name], f)
+
+
+def setup_environment():
+    """Resolve the workflow configuration from environment variables."""
+    return SimpleNamespace(
+        llm_engine_name=os.getenv("AGENTFLOW_LLM_ENGINE", "dashscope"),
+        base_url=os.getenv("AGENTFLOW_BASE_URL", None),
+        openai_api_key=os.getenv("OPENAI_API_KEY", ""),
+        dashscope_api_key=os.getenv("DASHSCOPE_API_KEY", ""),
+        google_api_key=os.getenv("GOOGLE_API_KEY", ""),
+    )
+
+
+# Resolved once at import: the environment does not change mid-run, and a
+# stable config keeps the solver cache keys stable across calls.
+_CFG = setup_environment()
+
+
+def _make_agent(llm_model, enabled_tools, tool_engine):
+    return construct_solver(
+        llm_engine_name=llm_model or _CFG.llm_engine_name,
+        enabled_tools=list(enabled_tools),
+        tool_engine=list(tool_engine),
+        output_types="direct",
+        max_steps=3,
+        max_time=120,
+        base_url=_CFG.base_url,
+        verbose=False,
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_base_solver(role, llm_model, enabled_tools, tool_engine):
+    """
+    Memoized construction of the expensive solver internals (tool registry
+    walk, engine setup). The role is part of the key so agents that run
+    concurrently (e.g. extractor/identifier/analyzer) never share one solver
+    even when their tool configuration is identical. Never hand these out
+    directly -- go through _cached_construct_solver, which clones per call.
+    """
+    return _make_agent(llm_model, enabled_tools, tool_engine)
+
+
+def _clone_solver(base):
+    """
+    A cheap per-checkout view of a cached solver: shares the expensive
+    planner/verifier/executor but gets its own Memory, so one solve() never
+    inherits (or races with) another run's action history. Solver.__init__
+    is plain attribute assignment, so this costs microseconds.
+    """
+    return Solver(
+        planner=base.planner,
+        verifier=base.verifier,
+        memory=type(base.memory)(),
+        executor=base.executor,
+        output_types=",".join(base.output_types),
+        max_steps=base.max_steps,
+        max_time=base.max_time,
+        max_tokens=base.max_tokens,
+        root_cache_dir=base.root_cache_dir,
+        verbose=base.verbose,
+        temperature=base.temperature,
+    )
+
+
+def _cached_construct_solver(role, llm_model, enabled_tools, tool_engine):
+    return _clone_solver(_cached_base_solver(role, llm_model, enabled_tools, tool_engine))
+
+
+def create_planner_agent(llm_model=None):
+    return _cached_construct_solver("planner", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_researcher_agent(llm_model=None, fresh=False):
+    # fresh=True bypasses the cache for callers that run several researchers
+    # concurrently; a cached instance must not be shared across threads.
+    if fresh:
+        return _make_agent(llm_model, ("Google_Search_Tool", "Wikipedia_Search_Tool"), ("Default", "Default"))
+    return _cached_construct_solver(
+        "researcher", llm_model, ("Google_Search_Tool", "Wikipedia_Search_Tool"), ("Default", "Default")
+    )
+
+
+def create_cleaner_agent(llm_model=None):
+    return _cached_construct_solver("cleaner", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_extractor_agent(llm_model=None):
+    return _cached_construct_solver("extractor", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_identifier_agent(llm_model=None):
+    return _cached_construct_solver("identifier", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_analyzer_agent(llm_model=None):
+    return _cached_construct_solver("analyzer", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_analysis_agent(llm_model=None):
+    return _cached_construct_solver("analysis", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_checker_agent(llm_model=None):
+    return _cached_construct_solver("checker", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_generator_agent(llm_model=None):
+    return _cached_construct_solver("generator", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_writer_agent(llm_model=None):
+    return _cached_construct_solver("writer", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+def create_proofreader_agent(llm_model=None):
+    return _cached_construct_solver("proofreader", llm_model, ("Base_Generator_Tool",), ("Default",))
+
+
+_AGENT_FACTORIES = {
+    "planner": create_planner_agent,
+    "researcher": create_researcher_agent,
+    "cleaner": create_cleaner_agent,
+    "extractor": create_extractor_agent,
+    "identifier": create_identifier_agent,
+    "analyzer": create_analyzer_agent,
+    "analysis": create_analysis_agent,
+    "checker": create_checker_agent,
+    "generator": create_generator_agent,
+    "writer": create_writer_agent,
+    "proofreader": create_proofreader_agent,
+}
+
+
+def _fresh_agent_for(agent_name, llm_model):
+    """A replacement solver for a retry; 'researcher_3' maps to the researcher factory."""
+    factory = _AGENT_FACTORIES.get(agent_name) or _AGENT_FACTORIES.get(agent_name.rsplit("_", 1)[0])
+    if factory is None:
+        return None
+    return factory(llm_model)
+
+
+class ResearchWorkflowOrchestrator:
+    def __init__(self, llm_model=None, fused=True):
+        self.llm_model = llm_model
+        # Fused mode analyzes facts/bias/sentiment in one LLM call since all
+        # three read the same text; fused=False keeps the separate agents
+        # for debugging individual analyses.
+        self.fused = fused
+        # Per-agent bookkeeping as parallel arrays (structure-of-arrays):
+        # contiguous appends and cheap vectorized aggregation when many
+        # workflows are run in a batch, vs. nested dicts of strings.
+        self.metric_names = []
+        self.metric_latencies = array("d")
+        self.metric_successes = array("b")
+        # Cap concurrent searches to stay within search-API rate limits
+        self._search_semaphore = asyncio.Semaphore(5)
+        # Hard cap on outstanding LLM calls across all stages, matched to
+        # the worker pool installed in main()
+        self._llm_semaphore = asyncio.Semaphore(8)
+        self._semantic_cache = SemanticCache() if SEMANTIC_CACHE_AVAILABLE else None
+        # Exact-match prompt cache: in-memory dict backed by one file per
+        # entry on disk. Checked before the semantic cache since a hash
+        # lookup is far cheaper than an embedding round trip.
+        self._prompt_cache = {}
+        self._prompt_cache_dir = os.path.join(CACHE_DIR, "prompts")
+        os.makedirs(self._prompt_cache_dir, exist_ok=True)
+        # Coalesce concurrent identical requests onto one solve() call
+        self._inflight = {}
+        # Construct every agent up-front (warming the solver cache) so no
+        # stage blocks the event loop on construct_solver mid-workflow.
+        for factory in (
+            create_planner_agent, create_researcher_agent, create_cleaner_agent,
+            create_extractor_agent, create_identifier_agent, create_analyzer_agent,
+            create_analysis_agent, create_checker_agent, create_generator_agent,
+            create_writer_agent, create_proofreader_agent,
+        ):
+            factory(llm_model)
+
+    def _record_metric(self, agent_name, start_time, success):
+        self.metric_names.append(agent_name)
+        self.metric_latencies.append(time.time() - start_time)
+        self.metric_successes.append(1 if success else 0)
+
+    def get_metrics(self):
+        """The recorded metrics as parallel sequences (names/latencies/successes)."""
+        return {
+            "names": list(self.metric_names),
+            "latencies": list(self.metric_latencies),
+            "successes": list(self.metric_successes),
+        }
+
+    async def _execute_agent(self, agent_name, agent, query, timeout=None):
+        """
+        Run one agent's solve() off the event loop and record its metrics.
+
+        The timeout defaults to the agent's budget from TIMEOUTS. Returns the
+        solver's json_data dict, or {} on timeout/failure so callers can fall
+        back via .get().
+        """
+        start_time = time.time()
+        if timeout is None:
+            timeout = _timeout_for(agent_name)
+        cache_key = hashlib.sha256(f"{agent_name}|{self.llm_model}|{query}".encode()).hexdigest()
+        cached_output = self._prompt_cache_get(cache_key)
+        if cached_output is not None:
+            print(f"  [cache] Exact prompt cache hit for '{agent_name}'")
+            self._record_metric(agent_name, start_time, True)
+            return {"direct_output": cached_output}
+        if self._semantic_cache is not None:
+            cached_output = self._semantic_cache.lookup(agent_name, query)
+            if cached_output is not None:
+                print(f"  [cache] Semantic cache hit for '{agent_name}'")
+                self._record_metric(agent_name, start_time, True)
+                return {"direct_output": cached_output}
+        if cache_key in self._inflight:
+            print(f"  [cache] Joining in-flight request for '{agent_name}'")
+            return await self._inflight[cache_key]
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            try:
+                # One jittered retry so a tightly budgeted timeout tripping
+                # on transient slowness does not doom the whole workflow.
+                for attempt in range(2):
+                    try:
+                        async with self._llm_semaphore:
+                            result = await asyncio.wait_for(agent.asolve(query), timeout=timeout)
+                        break
+                    except asyncio.TimeoutError:
+                        if attempt == 1:
+                            raise
+                        print(f"  [!] Agent '{agent_name}' timed out after {timeout}s, retrying...")
+                        # wait_for cannot cancel the worker thread, so the
+                        # timed-out solve() is still running on this solver.
+                        # Retry on a replacement instance instead of racing
+                        # the leaked thread on shared per-solve state.
+                        replacement = await asyncio.to_thread(_fresh_agent_for, agent_name, self.llm_model)
+                        if replacement is not None:
+                            agent = replacement
+                        await asyncio.sleep(0.5 + random.random())
+                self._record_metric(agent_name, start_time, True)
+                if result.get("direct_output"):
+                    self._prompt_cache_put(cache_key, result["direct_output"])
+                    if self._semantic_cache is not None:
+                        self._semantic_cache.store(agent_name, query, result["direct_output"])
+            except asyncio.TimeoutError:
+                print(f"  [!] Agent '{agent_name}' timed out after {timeout}s")
+                result = None
+            except Exception as e:
+                print(f"  [!] Agent '{agent_name}' failed: {str(e)}")
+                result = None
+            if result is None:
+                self._record_metric(agent_name, start_time, False)
+                result = {}
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result({})
+            del self._inflight[cache_key]
+
+    def _prompt_cache_get(self, cache_key):
+        if cache_key in self._prompt_cache:
+            return self._prompt_cache[cache_key]
+        cache_path = os.path.join(self._prompt_cache_dir, f"{cache_key}.txt")
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                output = f.read()
+            self._prompt_cache[cache_key] = output
+            return output
+        return None
+
+    def _prompt_cache_put(self, cache_key, output):
+        self._prompt_cache[cache_key] = output
+        cache_path = os.path.join(self._prompt_cache_dir, f"{cache_key}.txt")
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(output)
+        os.replace(tmp_path, cache_path)
+
+    def _extract_queries_from_response(self, response):
+        """Pull the planner's search queries out of its (loosely formatted) response."""
+        data = _find_json_object(response, '"queries"')
+        if data is not None:
+            queries = data.get("queries", [])
+            if queries:
+                return [str(q) for q in queries[:5]]
+
+        # Fallback: treat each substantial line as a query
+        queries = []
+        for line in response.split("\n"):
+            match = _QUERY_LINE_RE.match(line)
+            if match:
+                queries.append(match.group(1).strip().strip('"'))
+        return queries[:5]
+
+    async def _stage_planner(self, topic, results):
+        print("\n[planner] Generating search queries...")
+        planner = create_planner_agent(self.llm_model)
+        planner_result = await self._execute_agent(
+            "planner",
+            planner,
+            f'Generate 3 to 5 concise web search queries to research the topic "{topic}". '
+            f'Respond with JSON in the form {{"queries": ["...", "..."]}}.',
+        )
+        queries = self._extract_queries_from_response(planner_result.get("direct_output", ""))
+        if not queries:
+            queries = [topic]
+        print(f"  Queries: {queries}")
+        return queries
+
+    async def _stage_researcher(self, topic, results):
+        # Run all searches concurrently. The solver mutates shared
+        # planner/memory state during solve(), so each search gets its own
+        # researcher instance.
+        queries = results["planner"]
+        print(f"\n[researcher] Running {len(queries)} searches in parallel...")
+
+        async def run_search(index, search_query):
+            async with self._search_semaphore:
+                # Fresh solver construction walks the tool registry and is
+                # easily seconds of synchronous work; run it in the worker
+                # pool so it cannot stall the event loop (and thereby
+                # serialize the very searches this stage parallelizes).
+                researcher = await asyncio.to_thread(
+                    create_researcher_agent, self.llm_model, fresh=True
+                )
+                return await self._execute_agent(
+                    f"researcher_{index}", researcher, f"Search the web for: {search_query}"
+                )
+
+        search_results = await asyncio.gather(
+            *[run_search(i, q) for i, q in enumerate(queries, 1)]
+        )
+        # The cleaner only consumes ~5000 characters, so accumulate under a
+        # length budget instead of materializing the full join and slicing
+        # most of it away.
+        chunks = []
+        running_len = 0
+        for result in search_results:
+            piece = result.get("direct_output", "")
+            if not piece:
+                continue
+            chunks.append(piece)
+            running_len += len(piece) + 7  # + separator
+            if running_len >= 5000:
+                break
+        return "\n\n---\n\n".join(chunks)[:5000]
+
+    async def _stage_cleaner(self, topic, results):
+        raw_data = results["researcher"]
+        print("\n[cleaner] Deduplicating and cleaning results...")
+        cleaner = create_cleaner_agent(self.llm_model)
+        # Downstream stages only consume the first 3000 characters, and the
+        # engine layer has no streaming API to hand partial output forward,
+        # so bound the generation itself: tokens past the analysis budget
+        # would be paid for and then thrown away.
+        cleaner_result = await self._execute_agent(
+            "cleaner",
+            cleaner,
+            f"Clean up the following research notes: remove duplicates, ads and navigation "
+            f"debris, keep every substantive claim. Keep your answer under 3000 characters; "
+            f"prioritize the most substantive claims if space runs out.\n\n{raw_data}",
+        )
+        # Slice to the analysis budget once here; every Stage 4 consumer
+        # reads the same bounded string instead of re-slicing its own copy.
+        return cleaner_result.get("direct_output", raw_data)[:3000]
+
+    async def _stage_extractor(self, topic, results):
+        print("\n[extractor] Extracting key facts...")
+        extractor = create_extractor_agent(self.llm_model)
+        result = await self._execute_agent(
+            "extractor", extractor,
+            f"Extract the key facts from the following text as a bullet list:\n\n{results['cleaner']}",
+        )
+        return result.get("direct_output", "")
+
+    async def _stage_identifier(self, topic, results):
+        print("\n[identifier] Identifying bias...")
+        identifier = create_identifier_agent(self.llm_model)
+        result = await self._execute_agent(
+            "identifier", identifier,
+            f"Identify any bias or one-sided framing in the following text:\n\n{results['cleaner']}",
+        )
+        return result.get("direct_output", "")
+
+    async def _stage_analyzer(self, topic, results):
+        print("\n[analyzer] Analyzing sentiment...")
+        analyzer = create_analyzer_agent(self.llm_model)
+        result = await self._execute_agent(
+            "analyzer", analyzer,
+            f"Analyze the overall sentiment of the following text in 2-3 sentences:\n\n{results['cleaner']}",
+        )
+        return result.get("direct_output", "")
+
+    async def _stage_fused_analysis(self, topic, results):
+        # Facts, bias and sentiment all read the same text, so one structured
+        # prompt replaces three LLM calls and pays the context tokens once.
+        print("\n[analysis] Extracting facts, bias and sentiment in one call...")
+        analysis_agent = create_analysis_agent(self.llm_model)
+        result = await self._execute_agent(
+            "analysis", analysis_agent,
+            f'Analyze the following text and respond with JSON of the form '
+            f'{{"facts": ["..."], "bias": "...", "sentiment": "..."}} where facts lists the key '
+            f'facts, bias describes any one-sided framing, and sentiment summarizes the overall '
+            f'sentiment in 2-3 sentences.\n\nTEXT:\n{results["cleaner"]}',
+        )
+        response = result.get("direct_output", "")
+        data = _find_json_object(response, '"facts"')
+        if data is None:
+            # Unparseable response: keep everything as facts so downstream
+            # stages still have material to work with.
+            return {"facts": response, "bias": "", "sentiment": ""}
+        facts = data.get("facts", "")
+        if isinstance(facts, list):
+            facts = "\n".join(f"- {fact}" for fact in facts)
+        return {
+            "facts": str(facts),
+            "bias": str(data.get("bias", "")),
+            "sentiment": str(data.get("sentiment", "")),
+        }
+
+    async def _stage_checker(self, topic, results):
+        facts_raw = results["analysis"]["facts"] if self.fused else results["extractor"]
+        print("\n[checker] Fact-checking...")
+        checker = create_checker_agent(self.llm_model)
+        checker_result = await self._execute_agent(
+            "checker",
+            checker,
+            f"Review the following extracted facts and flag any that look dubious or "
+            f"unsupported:\n\n{facts_raw}",
+        )
+        return checker_result.get("direct_output", facts_raw)
+
+    async def _stage_generator(self, topic, results):
+        print("\n[generator] Merging analyses...")
+        if self.fused:
+            bias_note = results["analysis"]["bias"]
+            sentiment = results["analysis"]["sentiment"]
+        else:
+            bias_note = results["identifier"]
+            sentiment = results["analyzer"]
+        generator = create_generator_agent(self.llm_model)
+        generator_result = await self._execute_agent(
+            "generator",
+            generator,
+            f"Combine the following into coherent report notes.\n\nVerified facts:\n{results['checker']}\n\n"
+            f"Bias assessment:\n{bias_note}\n\nSentiment:\n{sentiment}",
+        )
+        return generator_result.get("direct_output", results["checker"])
+
+    async def _stage_writer(self, topic, results):
+        print("\n[writer] Drafting the report...")
+        writer = create_writer_agent(self.llm_model)
+        writer_result = await self._execute_agent(
+            "writer",
+            writer,
+            f'Write a concise research report (4-6 paragraphs) on "{topic}" based on these '
+            f"notes:\n\n{results['generator']}",
+        )
+        return writer_result.get("direct_output", results["generator"])
+
+    async def _stage_proofreader(self, topic, results):
+        print("\n[proofreader] Final pass...")
+        proofreader = create_proofreader_agent(self.llm_model)
+        proofreader_result = await self._execute_agent(
+            "proofreader",
+            proofreader,
+            f"Proofread the following report, fixing grammar and clarity without changing "
+            f"its meaning:\n\n{results['writer']}",
+        )
+        return proofreader_result.get("direct_output", results["writer"])
+
+    def _build_task_graph(self):
+        """The workflow DAG; the scheduler derives execution order from deps."""
+        graph = [
+            Task("planner", (), self._stage_planner),
+            Task("researcher", ("planner",), self._stage_researcher),
+            Task("cleaner", ("researcher",), self._stage_cleaner),
+        ]
+        if self.fused:
+            graph += [
+                Task("analysis", ("cleaner",), self._stage_fused_analysis),
+                Task("checker", ("analysis",), self._stage_checker),
+                Task("generator", ("checker", "analysis"), self._stage_generator),
+            ]
+        else:
+            graph += [
+                Task("extractor", ("cleaner",), self._stage_extractor),
+                Task("identifier", ("cleaner",), self._stage_identifier),
+                Task("analyzer", ("cleaner",), self._stage_analyzer),
+                Task("checker", ("extractor",), self._stage_checker),
+                Task("generator", ("checker", "identifier", "analyzer"), self._stage_generator),
+            ]
+        graph += [
+            Task("writer", ("generator",), self._stage_writer),
+            Task("proofreader", ("writer",), self._stage_proofreader),
+        ]
+        return graph
+
+    async def execute_workflow(self, topic):
+        """
+        Run the research-report pipeline for a topic.
+
+        Tasks are scheduled by dependency readiness rather than source order,
+        and each task launches the moment its dependencies complete instead of
+        waiting for a whole wave. The checker therefore starts as soon as the
+        extractor returns, overlapping with the identifier and analyzer.
+        """
+        workflow_start = time.time()
+        print(f"\n==> Starting research workflow for: {topic}")
+
+        results = {}
+        pending = {task.name: task for task in self._build_task_graph()}
+        running = {}
+
+        def launch_ready():
+            for name, task in list(pending.items()):
+                if all(dep in results for dep in task.deps):
+                    running[asyncio.create_task(task.fn(topic, results))] = name
+                    del pending[name]
+
+        launch_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                results[running.pop(finished)] = finished.result()
+            launch_ready()
+        if pending:
+            raise RuntimeError(f"Dependency cycle among workflow tasks: {sorted(pending)}")
+
+        total_time = round(time.time() - workflow_start, 2)
+        print(f"\n==> Workflow finished in {total_time}s")
+        return {
+            "topic": topic,
+            "queries": results["planner"],
+            "report": results["proofreader"],
+            "metrics": self.get_metrics(),
+            "total_time": total_time,
+        }
+
+    def print_metrics_summary(self):
+        print("\n==> Agent metrics:")
+        for agent_name, latency, success in zip(
+            self.metric_names, self.metric_latencies, self.metric_successes
+        ):
+            status = "ok" if success else "FAILED"
+            print(f"  {agent_name:<16} {latency:>7.2f}s  [{status}]")
+
+
+async def test_researcher_agent():
+    """Smoke test: one researcher search round trip."""
+    print("\n==> Testing researcher agent...")
+    researcher = create_researcher_agent()
+    result = await researcher.asolve("Search the web for: capital of France")
+    print(result.get("direct_output", ""))
+
+
+async def test_simple_workflow():
+    """Smoke test: planner, researcher and writer on a tiny task."""
+    print("\n==> Testing simple workflow...")
+    # The cached constructors reuse solver instances across repeated test
+    # runs, and the three calls are independent, so run them concurrently.
+    planner = create_planner_agent()
+    researcher = create_researcher_agent()
+    writer = create_writer_agent()
+
+    planner_result, researcher_result, writer_result = await asyncio.gather(
+        planner.asolve('Generate 2 search queries about solar energy as JSON {"queries": [...]}'),
+        researcher.asolve("Search the web for: recent solar energy efficiency records"),
+        writer.asolve("Write one paragraph about the benefits of solar energy."),
+    )
+    print(f"Planner: {planner_result.get('direct_output', '')}")
+    print(f"Researcher: {researcher_result.get('direct_output', '')}")
+    print(f"Writer: {writer_result.get('direct_output', '')}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run the research report workflow.")
+    parser.add_argument("--topic", default="The impact of open-source LLMs", help="Topic to research.")
+    parser.add_argument("--llm_engine_name", default=None, help="LLM engine name (defaults to AGENTFLOW_LLM_ENGINE).")
+    parser.add_argument("--test", action="store_true", help="Run the smoke tests instead of the full workflow.")
+    parser.add_argument("--separate_analysis", action="store_true",
+                        help="Run extractor/identifier/analyzer as separate agents instead of one fused call.")
+    return parser.parse_args()
+
+
+async def main(args):
+    # Right-size the worker pool backing asyncio.to_thread (and thus
+    # Solver.asolve): 8 workers matches the LLM call cap, avoiding the
+    # default executor's min(32, cpu+4) thread pile-up.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=8, thread_name_prefix="agentflow-solver"))
+
+    if args.test:
+        await test_researcher_agent()
+        await test_simple_workflow()
+        return
+
+    orchestrator = ResearchWorkflowOrchestrator(
+        llm_model=args.llm_engine_name, fused=not args.separate_analysis
+    )
+    output = await orchestrator.execute_workflow(args.topic)
+    print(f"\n==> Final Report:\n\n{output['report']}")
+    orchestrator.print_metrics_summary()
+
+
+if __name__ == "__main__":
+    # uvloop cuts event-loop overhead for the gather fan-outs; fall back to
+    # the default loop where it is unavailable (e.g. Windows).
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+    args = parse_arguments()
+    asyncio.run(main(args))